@@ -0,0 +1,440 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from virtual_keyboard import AdvancedVirtualKeyboard, InteractionController
+
+
+# Interaction settings (swept) and simulated-user settings
+DEFAULT_CONFIG = {
+    'mode': 'click',               # 'click' (FIST) or 'hover' (OPEN_PALM)
+    'hover_duration': 1.5,         # seconds, AdvancedVirtualKeyboard.hover_duration_threshold
+    'stability_frames': 3,
+    'click_cooldown_frames': 10,
+    'smoothing_frames': 5,
+    'fps': 30.0,                   # camera/processing rate of the deployment
+    'aim_error': 8.0,              # px, std-dev of where the user lands on a key
+    'jitter': 3.0,                 # px, per-frame hand tremor / tracking noise
+    'move_speed': 40.0,            # px per frame while pointing
+    'reaction_frames': 6,          # frames the user keeps the gesture after a key registers
+    'patience': 4.0,               # seconds before the user re-aims a press that does nothing
+    'max_seconds_per_char': 10.0,  # give up on a phrase after this budget
+}
+
+# Sample phrases in the style of standard text-entry phrase sets
+DEFAULT_PHRASES = [
+    "the quick brown fox",
+    "my watch fell in the water",
+    "time to go shopping",
+    "prevailing wind from the east",
+]
+
+CHAR_TO_KEY = {' ': 'SPACE', '\n': 'ENTER', ',': ',', '.': '.', '?': '?'}
+FIX_KEYS = ('BACKSPACE', 'CLEAR')
+MODIFIER_KEYS = ('SHIFT', 'CAPS')
+METRICS = ('wpm', 'kspc', 'uncorrected_error_rate', 'corrected_error_rate')
+# Settings that must be at least 1 (smoothing window, frame rate, pointing speed)
+POSITIVE_SETTINGS = ('smoothing_frames', 'fps', 'move_speed')
+# Settings that only drive the synthetic typist; recorded frames carry their own gestures and timing
+SYNTHETIC_SETTINGS = ('mode', 'fps', 'aim_error', 'jitter', 'move_speed', 'reaction_frames',
+                      'patience', 'max_seconds_per_char')
+INTERACTION_SETTINGS = ('hover_duration', 'stability_frames', 'click_cooldown_frames', 'smoothing_frames')
+
+
+def validate_phrase(phrase):
+    """Raise ValueError if the phrase contains characters the keyboard cannot type."""
+    labels = {label for (_, _, _, _, label) in AdvancedVirtualKeyboard().keyboard_rects}
+    for ch in phrase:
+        key = ch.upper() if ch.isalpha() else CHAR_TO_KEY.get(ch, ch)
+        if key not in labels:
+            raise ValueError(f"Character {ch!r} in phrase {phrase!r} cannot be typed on the keyboard")
+
+
+def next_key(text, target, shift_active, caps_lock):
+    """Key an attentive user presses next to turn `text` into `target` (None when done)."""
+    if not target.startswith(text):
+        return 'BACKSPACE'
+    if text == target:
+        return None
+
+    ch = target[len(text)]
+    if ch.isalpha():
+        if ch.isupper() != (shift_active or caps_lock):
+            return 'CAPS' if caps_lock else 'SHIFT'
+        return ch.upper()
+    return CHAR_TO_KEY.get(ch, ch)
+
+
+def levenshtein(a, b):
+    """Minimum string distance between two strings."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def compute_metrics(phrase, transcribed, keystrokes):
+    """Text-entry metrics for one trial.
+
+    `keystrokes` is a list of (time, key) pairs. Error rates follow the
+    Soukoreff & MacKenzie keystroke taxonomy: BACKSPACE/CLEAR are fix
+    keystrokes, SHIFT/CAPS count towards KSPC but not towards error rates.
+    """
+    # Words per minute, timed from first to last keystroke
+    elapsed = keystrokes[-1][0] - keystrokes[0][0] if keystrokes else 0.0
+    if elapsed > 0 and len(transcribed) > 1:
+        wpm = (len(transcribed) - 1) / elapsed * 60 / 5
+    else:
+        wpm = 0.0
+
+    kspc = len(keystrokes) / len(transcribed) if transcribed else float(len(keystrokes))
+
+    # Correct (C), incorrect-not-fixed (INF) and incorrect-fixed (IF) characters
+    msd = levenshtein(phrase, transcribed)
+    correct = max(len(phrase), len(transcribed)) - msd
+    fixes = sum(1 for _, key in keystrokes if key in FIX_KEYS)
+    char_keystrokes = sum(1 for _, key in keystrokes if key not in MODIFIER_KEYS) - fixes
+    incorrect_fixed = max(char_keystrokes - len(transcribed), 0)
+    total = correct + msd + incorrect_fixed
+
+    return {
+        'wpm': wpm,
+        'kspc': kspc,
+        'uncorrected_error_rate': msd / total if total else 0.0,
+        'corrected_error_rate': incorrect_fixed / total if total else 0.0,
+    }
+
+
+def build_session(config):
+    """Create a keyboard and interaction controller configured for one trial."""
+    keyboard = AdvancedVirtualKeyboard()
+    keyboard.hover_duration_threshold = config['hover_duration']
+    controller = InteractionController(
+        keyboard,
+        smoothing_frames=config['smoothing_frames'],
+        stability_frames=config['stability_frames'],
+        click_cooldown_frames=config['click_cooldown_frames'],
+    )
+    return keyboard, controller
+
+
+class SyntheticTypist:
+    """Closed-loop simulated user driving the keyboard one frame at a time.
+
+    The user points at the next key, holds the action gesture until a key
+    registers, and corrects mistakes with BACKSPACE like a real typist would.
+    """
+    def __init__(self, config, seed):
+        self.config = config
+        self.rng = random.Random(seed)
+        self.keyboard, self.controller = build_session(config)
+        self.key_centers = {
+            label: (x + w / 2, y + h / 2) for (x, y, w, h, label) in self.keyboard.keyboard_rects
+        }
+        self.action = 'FIST' if config['mode'] == 'click' else 'OPEN_PALM'
+        self.frame_time = 1.0 / config['fps']
+        self.time = 0.0
+        self.hand_pos = (640.0, 200.0)  # Hand starts above the keyboard
+        self.keystrokes = []
+
+    def feed(self, gesture, target):
+        """Send one frame with the hand at `target` plus tremor; return the key typed, if any."""
+        jitter = self.config['jitter']
+        x = int(round(target[0] + self.rng.gauss(0, jitter)))
+        y = int(round(target[1] + self.rng.gauss(0, jitter)))
+        _, typed_key = self.controller.step(gesture, (x, y), self.time)
+        if typed_key:
+            self.keystrokes.append((self.time, typed_key))
+        self.time += self.frame_time
+        return typed_key
+
+    def press(self, key, deadline):
+        """Move to `key` and hold the action gesture until something registers."""
+        cx, cy = self.key_centers[key]
+        aim_error = self.config['aim_error']
+        aim = (cx + self.rng.gauss(0, aim_error), cy + self.rng.gauss(0, aim_error))
+
+        # Pointing movement
+        start_x, start_y = self.hand_pos
+        distance = math.hypot(aim[0] - start_x, aim[1] - start_y)
+        steps = max(1, math.ceil(distance / self.config['move_speed']))
+        for i in range(1, steps + 1):
+            self.feed('POINT', (start_x + (aim[0] - start_x) * i / steps,
+                                start_y + (aim[1] - start_y) * i / steps))
+        self.hand_pos = aim
+
+        # Hold the action gesture until a key registers or the user loses patience
+        give_up = min(self.time + self.config['patience'], deadline)
+        typed_key = None
+        while typed_key is None and self.time < give_up:
+            typed_key = self.feed(self.action, aim)
+
+        # Reaction delay before the user notices and releases
+        if typed_key is not None:
+            for _ in range(self.config['reaction_frames']):
+                self.feed(self.action, aim)
+
+    def type_phrase(self, phrase):
+        """Type `phrase`, returning (transcribed text, keystrokes, completed)."""
+        deadline = self.config['max_seconds_per_char'] * max(len(phrase), 1)
+        keyboard = self.keyboard
+
+        while self.time < deadline:
+            key = next_key(keyboard.text, phrase, keyboard.shift_active, keyboard.caps_lock)
+            if key is None:
+                break
+            self.press(key, deadline)
+
+        return keyboard.text, self.keystrokes, keyboard.text == phrase
+
+
+def replay_trajectory(frames, config):
+    """Feed recorded [time, gesture, x, y] frames through the interaction logic.
+
+    Frames without a detected hand use null for gesture and coordinates.
+    Returns (transcribed text, keystrokes).
+    """
+    keyboard, controller = build_session(config)
+    keystrokes = []
+    for t, gesture, x, y in frames:
+        cursor_pos = (int(x), int(y)) if x is not None and y is not None else None
+        _, typed_key = controller.step(gesture, cursor_pos, t)
+        if typed_key:
+            keystrokes.append((t, typed_key))
+    return keyboard.text, keystrokes
+
+
+def load_trajectories(path):
+    """Load recorded trajectories: a JSON object or list of {"phrase": ..., "frames": [...]}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a trajectory object or a list of them")
+
+    for index, trajectory in enumerate(data):
+        if not isinstance(trajectory, dict) or not isinstance(trajectory.get('phrase'), str):
+            raise ValueError(f"{path}: trajectory {index} has no 'phrase' string")
+        frames = trajectory.get('frames')
+        if not isinstance(frames, list):
+            raise ValueError(f"{path}: trajectory {index} has no 'frames' list")
+        for frame_index, frame in enumerate(frames):
+            if not is_valid_frame(frame):
+                raise ValueError(
+                    f"{path}: trajectory {index}, frame {frame_index} is not [time, gesture, x, y]")
+    return data
+
+
+def is_valid_frame(frame):
+    """Check one recorded frame: numeric time, str/null gesture, numeric or null x and y together."""
+    def is_number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    if not isinstance(frame, list) or len(frame) != 4:
+        return False
+    t, gesture, x, y = frame
+    if not is_number(t) or not (gesture is None or isinstance(gesture, str)):
+        return False
+    return (x is None and y is None) or (is_number(x) and is_number(y))
+
+
+def run_trial(task):
+    """Run one (config, phrase, seed, frames) task; executed inside the worker pool."""
+    config, phrase, seed, frames = task
+    if frames is None:
+        transcribed, keystrokes, completed = SyntheticTypist(config, seed).type_phrase(phrase)
+    else:
+        transcribed, keystrokes = replay_trajectory(frames, config)
+        completed = transcribed == phrase
+
+    result = compute_metrics(phrase, transcribed, keystrokes)
+    result['completed'] = completed
+    return result
+
+
+def expand_grid(grid):
+    """Cartesian product of a {setting: [values]} grid merged over DEFAULT_CONFIG."""
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        config = dict(DEFAULT_CONFIG)
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+
+def prepare_sweep(grid, phrases=None, trajectories=None, trials=1, seed=0):
+    """Validate sweep inputs and expand them into (configs, workload).
+
+    Raises ValueError for anything that would otherwise fail inside a worker.
+    """
+    for name in POSITIVE_SETTINGS:
+        if any(value < 1 for value in grid.get(name, [])):
+            raise ValueError(f"{name} values must be at least 1")
+
+    if trajectories is not None:
+        if not trajectories:
+            raise ValueError("No recorded trajectories to replay")
+        ignored = [name for name in grid if name in SYNTHETIC_SETTINGS]
+        if ignored:
+            raise ValueError(f"Settings not used when replaying trajectories: {', '.join(ignored)}")
+        workload = [(t['phrase'], None, t['frames']) for t in trajectories]
+    else:
+        if trials < 1:
+            raise ValueError("trials must be at least 1")
+        workload = [(phrase, seed * 1000003 + index * 1009 + trial, None)
+                    for index, phrase in enumerate(phrases or DEFAULT_PHRASES)
+                    for trial in range(trials)]
+    for phrase, _, _ in workload:
+        validate_phrase(phrase)
+
+    return expand_grid(grid), workload
+
+
+def execute_sweep(configs, workload, workers=None):
+    """Evaluate every config against the workload in parallel; returns one summary row per config.
+
+    KSPC and error rates are averaged over every trial, so sessions that end
+    with an uncorrected typo still count. WPM is averaged over completed
+    trials only, so timed-out runs do not skew it; those show up in the
+    completion rate.
+    """
+    tasks = [(config, phrase, trial_seed, frames)
+             for config in configs for phrase, trial_seed, frames in workload]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // ((workers or 4) * 4))
+        results = list(executor.map(run_trial, tasks, chunksize=chunksize))
+
+    rows = []
+    for i, config in enumerate(configs):
+        config_results = results[i * len(workload):(i + 1) * len(workload)]
+        completed = [r for r in config_results if r['completed']]
+        row = dict(config)
+        for metric in METRICS:
+            averaged = completed if metric == 'wpm' else config_results
+            row[metric] = sum(r[metric] for r in averaged) / len(averaged) if averaged else None
+        row['completion_rate'] = len(completed) / len(config_results)
+        rows.append(row)
+
+    rows.sort(key=lambda row: (row['completion_rate'], row['wpm'] or 0.0), reverse=True)
+    return rows
+
+
+def run_sweep(grid, phrases=None, trajectories=None, trials=1, workers=None, seed=0):
+    """Evaluate every configuration in `grid` in parallel; returns one summary row per config.
+
+    Synthetic phrases are typed `trials` times each; recorded trajectories
+    are replayed once per configuration. Every configuration sees the same
+    seeds so differences come from the settings, not from the noise.
+    """
+    configs, workload = prepare_sweep(grid, phrases, trajectories, trials, seed)
+    return execute_sweep(configs, workload, workers)
+
+
+def format_table(rows, settings):
+    """Render summary rows as a plain-text table."""
+    columns = list(settings) + list(METRICS) + ['completion_rate']
+    headers = [c.replace('_', ' ') for c in columns]
+
+    def fmt(value):
+        if value is None:
+            return "-"
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    cells = [[fmt(row[c]) for c in columns] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+
+    lines = ["  ".join(h.rjust(w) for h, w in zip(headers, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    for r in cells:
+        lines.append("  ".join(c.rjust(w) for c, w in zip(r, widths)))
+    return "\n".join(lines)
+
+
+def save_csv(rows, path):
+    """Write summary rows to a CSV file."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def positive_int(value):
+    """argparse type for integers >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def positive_float(value):
+    """argparse type for floats >= 1."""
+    number = float(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure typing throughput and accuracy of the virtual keyboard across settings.")
+    parser.add_argument('--phrase', action='append', dest='phrases',
+                        help="Target phrase for synthetic trials (repeatable)")
+    parser.add_argument('--trajectories', help="JSON file of recorded trajectories to replay")
+    parser.add_argument('--trials', type=positive_int, default=3, help="Synthetic trials per phrase")
+    parser.add_argument('--workers', type=positive_int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', help="Also write the result table to this CSV file")
+
+    # Every setting accepts several values; the sweep covers their product
+    sweep = parser.add_argument_group("sweep settings (each accepts several values)")
+    sweep.add_argument('--mode', nargs='+', choices=['click', 'hover'])
+    for name, default in DEFAULT_CONFIG.items():
+        if name == 'mode':
+            continue
+        if name in POSITIVE_SETTINGS:
+            value_type = positive_int if isinstance(default, int) else positive_float
+        else:
+            value_type = type(default)
+        sweep.add_argument('--' + name.replace('_', '-'), nargs='+', type=value_type,
+                           dest=name, metavar='VALUE', help=f"default: {default}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = {name: getattr(args, name) for name in DEFAULT_CONFIG if getattr(args, name)}
+
+    # Check every input up front; errors inside workers are real bugs and keep their traceback
+    try:
+        trajectories = load_trajectories(args.trajectories) if args.trajectories else None
+        configs, workload = prepare_sweep(grid, phrases=args.phrases, trajectories=trajectories,
+                                          trials=args.trials, seed=args.seed)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rows = execute_sweep(configs, workload, workers=args.workers)
+
+    # Show the swept settings, or the interaction defaults when nothing was swept
+    default_settings = list(INTERACTION_SETTINGS) if trajectories is not None else ['mode', *INTERACTION_SETTINGS]
+    settings = [name for name in grid if len(grid[name]) > 1] or default_settings
+    print(format_table(rows, settings))
+
+    if args.csv:
+        save_csv(rows, args.csv)
+        print(f"Results saved to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import json
+
+import pytest
+
+# virtual_keyboard imports the camera/tracking stack at module level
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from evaluate_keyboard import (
+    DEFAULT_CONFIG, SyntheticTypist, compute_metrics, levenshtein, load_trajectories, main,
+    next_key, prepare_sweep, replay_trajectory, run_sweep, validate_phrase,
+)
+from virtual_keyboard import AdvancedVirtualKeyboard, InteractionController, TrajectoryRecorder
+
+
+def key_center(keyboard, label):
+    for (x, y, w, h, key) in keyboard.keyboard_rects:
+        if key == label:
+            return (x + w // 2, y + h // 2)
+    raise KeyError(label)
+
+
+def recorded_frames(keys, frame_time=1 / 30):
+    """Frames of a user pointing at each key and then making a fist, as the live loop records them."""
+    keyboard = AdvancedVirtualKeyboard()
+    frames = []
+    t = 0.0
+    for key in keys:
+        x, y = key_center(keyboard, key)
+        for gesture in ["POINT"] * 6 + ["FIST"] * 5:
+            frames.append([t, gesture, x, y])
+            t += frame_time
+    frames.append([t, None, None, None])
+    return frames
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def keystrokes(*keys):
+    return [(float(i), key) for i, key in enumerate(keys)]
+
+
+def test_levenshtein():
+    assert levenshtein("", "") == 0
+    assert levenshtein("abc", "abc") == 0
+    assert levenshtein("abc", "abd") == 1
+    assert levenshtein("kitten", "sitting") == 3
+    assert levenshtein("", "abc") == 3
+
+
+def test_metrics_error_free():
+    metrics = compute_metrics("abc", "abc", keystrokes('A', 'B', 'C'))
+    assert metrics['kspc'] == 1.0
+    assert metrics['uncorrected_error_rate'] == 0.0
+    assert metrics['corrected_error_rate'] == 0.0
+    # 2 characters after the first in 2 seconds
+    assert metrics['wpm'] == pytest.approx(2 / 2 * 60 / 5)
+
+
+def test_metrics_corrected_error():
+    metrics = compute_metrics("abc", "abc", keystrokes('A', 'X', 'BACKSPACE', 'B', 'C'))
+    assert metrics['kspc'] == pytest.approx(5 / 3)
+    assert metrics['uncorrected_error_rate'] == 0.0
+    assert metrics['corrected_error_rate'] == pytest.approx(0.25)
+
+
+def test_metrics_uncorrected_and_corrected_errors():
+    metrics = compute_metrics(
+        "the fox", "the fix",
+        keystrokes('T', 'H', 'E', 'SPACE', 'F', 'X', 'BACKSPACE', 'I', 'X'))
+    # C = 6, INF = 1, IF = 1
+    assert metrics['uncorrected_error_rate'] == pytest.approx(1 / 8)
+    assert metrics['corrected_error_rate'] == pytest.approx(1 / 8)
+
+
+def test_metrics_modifiers_count_only_towards_kspc():
+    metrics = compute_metrics("Ab", "Ab", keystrokes('SHIFT', 'A', 'B'))
+    assert metrics['kspc'] == pytest.approx(3 / 2)
+    assert metrics['corrected_error_rate'] == 0.0
+
+
+def test_next_key():
+    assert next_key("", "hi", False, False) == 'H'
+    assert next_key("h", "hi there", False, False) == 'I'
+    assert next_key("hi", "hi there", False, False) == 'SPACE'
+    assert next_key("hx", "hi", False, False) == 'BACKSPACE'
+    assert next_key("hi", "hi", False, False) is None
+    assert next_key("", "Hi", False, False) == 'SHIFT'
+    assert next_key("H", "Hi", True, False) == 'SHIFT'
+    assert next_key("H", "Hi", False, True) == 'CAPS'
+    assert next_key("", "a\n", False, False) == 'A'
+    assert next_key("a", "a\n", False, False) == 'ENTER'
+
+
+def test_validate_phrase():
+    validate_phrase("Hello, world 42?")
+    for phrase in ("x²", "café", "a;b"):
+        with pytest.raises(ValueError):
+            validate_phrase(phrase)
+
+
+def test_click_types_once_per_cooldown():
+    keyboard = AdvancedVirtualKeyboard()
+    controller = InteractionController(keyboard, stability_frames=3, click_cooldown_frames=10)
+    center = key_center(keyboard, 'A')
+
+    typed_frames = []
+    for frame in range(40):
+        _, typed_key = controller.step("FIST", center, frame / 30)
+        if typed_key:
+            assert typed_key == 'A'
+            typed_frames.append(frame)
+
+    assert typed_frames == [3, 13, 23, 33]
+    assert keyboard.text == "aaaa"
+
+
+def test_hover_fires_after_threshold():
+    keyboard = AdvancedVirtualKeyboard()
+    keyboard.hover_duration_threshold = 1.5
+    controller = InteractionController(keyboard, stability_frames=0)
+    center = key_center(keyboard, 'Q')
+
+    assert controller.step("OPEN_PALM", center, 0.0)[1] is None
+    assert controller.step("OPEN_PALM", center, 1.0)[1] is None
+    assert controller.step("OPEN_PALM", center, 1.49)[1] is None
+    assert controller.step("OPEN_PALM", center, 1.5)[1] == 'Q'
+    assert keyboard.text == "q"
+    # The re-trigger guard holds off a second key for an extra second
+    assert controller.step("OPEN_PALM", center, 3.0)[1] is None
+    assert controller.step("OPEN_PALM", center, 4.0)[1] == 'Q'
+
+
+def test_pointing_never_types():
+    keyboard = AdvancedVirtualKeyboard()
+    controller = InteractionController(keyboard)
+    center = key_center(keyboard, 'A')
+
+    for frame in range(30):
+        assert controller.step("POINT", center, frame / 30)[1] is None
+    assert keyboard.hovered_key == 'A'
+    assert keyboard.text == ""
+
+
+def test_synthetic_typist_types_phrase():
+    text, typed, completed = SyntheticTypist(dict(DEFAULT_CONFIG), seed=1).type_phrase("hi")
+    assert completed
+    assert text == "hi"
+    assert [key for _, key in typed][-2:] == ['H', 'I']
+
+
+def test_synthetic_typist_gives_up_on_double_registering_settings():
+    # Cooldown shorter than the reaction delay registers every press twice
+    config = dict(DEFAULT_CONFIG, click_cooldown_frames=3, max_seconds_per_char=2.0)
+    text, typed, completed = SyntheticTypist(config, seed=1).type_phrase("hi")
+    assert not completed
+    assert len(typed) > 2
+
+
+def test_replay_trajectory():
+    text, typed = replay_trajectory(recorded_frames(['H', 'I']), dict(DEFAULT_CONFIG))
+    assert text == "hi"
+    assert [key for _, key in typed] == ['H', 'I']
+
+
+def test_recorder_output_replays(tmp_path):
+    recorder = TrajectoryRecorder("hi")
+    for t, gesture, x, y in recorded_frames(['H', 'I']):
+        recorder.record(t, gesture, (x, y) if x is not None else None)
+    trajectories = load_trajectories(write_json(tmp_path / "session.json", recorder.to_dict()))
+
+    assert trajectories[0]['phrase'] == "hi"
+    assert replay_trajectory(trajectories[0]['frames'], dict(DEFAULT_CONFIG))[0] == "hi"
+
+
+@pytest.mark.parametrize("data", [
+    [{"frames": []}],
+    [{"phrase": "a"}],
+    "not a trajectory",
+    [{"phrase": "a", "frames": [[0, "FIST", 1]]}],
+    [{"phrase": "a", "frames": [["0", "FIST", 1, 2]]}],
+    [{"phrase": "a", "frames": [[0, 3, 1, 2]]}],
+    [{"phrase": "a", "frames": [[0, "FIST", 1, None]]}],
+    [{"phrase": "a", "frames": [[0, "FIST", "1", 2]]}],
+])
+def test_load_trajectories_rejects_bad_files(tmp_path, data):
+    with pytest.raises(ValueError):
+        load_trajectories(write_json(tmp_path / "bad.json", data))
+
+
+def test_prepare_sweep_rejects_bad_input():
+    trajectories = [{"phrase": "hi", "frames": recorded_frames(['H', 'I'])}]
+    with pytest.raises(ValueError):
+        prepare_sweep({'smoothing_frames': [0]})
+    with pytest.raises(ValueError):
+        prepare_sweep({}, trials=0)
+    with pytest.raises(ValueError):
+        prepare_sweep({}, phrases=["x\u00b2"])
+    with pytest.raises(ValueError):
+        prepare_sweep({}, trajectories=[])
+    with pytest.raises(ValueError):
+        prepare_sweep({'jitter': [1.0]}, trajectories=trajectories)
+
+    configs, workload = prepare_sweep({'stability_frames': [2, 3]}, trajectories=trajectories)
+    assert len(configs) == 2
+    assert len(workload) == 1
+
+
+def test_synthetic_sweep():
+    rows = run_sweep({'click_cooldown_frames': [3, 10]}, phrases=["hi"], trials=2, workers=1)
+    assert len(rows) == 2
+
+    good, bad = rows
+    assert good['click_cooldown_frames'] == 10
+    assert good['completion_rate'] == 1.0
+    assert isinstance(good['wpm'], float) and good['wpm'] > 0
+    assert good['kspc'] == 1.0
+
+    assert bad['click_cooldown_frames'] == 3
+    assert bad['completion_rate'] == 0.0
+    assert bad['wpm'] is None
+    assert isinstance(bad['kspc'], float) and bad['kspc'] > 1.0
+
+
+def test_replay_sweep_keeps_uncorrected_errors():
+    # A session meant as "the fox" that ends as "the fix"
+    frames = recorded_frames(['T', 'H', 'E', 'SPACE', 'F', 'I', 'X'])
+    rows = run_sweep({}, trajectories=[{"phrase": "the fox", "frames": frames}], workers=1)
+
+    assert len(rows) == 1
+    assert rows[0]['completion_rate'] == 0.0
+    assert rows[0]['wpm'] is None
+    assert rows[0]['uncorrected_error_rate'] == pytest.approx(1 / 7)
+    assert rows[0]['corrected_error_rate'] == 0.0
+
+
+def test_main_prints_table(capsys):
+    main(["--phrase", "hi", "--trials", "1", "--workers", "1"])
+    out = capsys.readouterr().out
+    assert "wpm" in out
+    assert "completion rate" in out
+
+
+def test_main_reports_bad_input(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["--trajectories", write_json(tmp_path / "empty.json", [])])
+    assert "Error: No recorded trajectories" in capsys.readouterr().out
@@ -5,6 +5,8 @@ from collections import deque
 import threading
 import time
 import datetime
+import argparse
+import json
 import sys
 import math
 
@@ -316,9 +318,10 @@ class AdvancedVirtualKeyboard:
                 if self.shift_active:
                     self.shift_active = False
     
-    def update_hover(self, key):
-        """Update hover state for click-less typing."""
-        current_time = time.time()
+    def update_hover(self, key, current_time=None):
+        """Update hover state for click-less typing. Returns the key typed, if any."""
+        if current_time is None:
+            current_time = time.time()
         
         if key != self.hover_key:
             self.hover_key = key
@@ -327,6 +330,97 @@ class AdvancedVirtualKeyboard:
             # Auto-type after hovering
             self.type_key(key)
             self.hover_start_time = current_time + 1  # Prevent immediate re-trigger
+            return key
+        return None
+
+
+class InteractionController:
+    """Per-frame cursor smoothing, gesture stability and click/hover handling.
+    
+    Shared by the live camera loop and the offline evaluator so both run
+    exactly the same interaction logic.
+    """
+    def __init__(self, keyboard, smoothing_frames=5, stability_frames=3, click_cooldown_frames=10):
+        self.keyboard = keyboard
+        
+        # Smoothing for cursor
+        self.cursor_history = deque(maxlen=smoothing_frames)
+        
+        # Control variables
+        self.last_gesture = None
+        self.gesture_stable_count = 0
+        self.gesture_stability_threshold = stability_frames
+        
+        # Click detection
+        self.click_cooldown = 0
+        self.click_cooldown_frames = click_cooldown_frames
+    
+    def step(self, gesture, cursor_pos, current_time=None):
+        """Advance one frame. Returns (smoothed cursor position, key typed this frame)."""
+        keyboard = self.keyboard
+        typed_key = None
+        
+        # Smooth cursor movement
+        if cursor_pos:
+            self.cursor_history.append(cursor_pos)
+            if len(self.cursor_history) >= max(1, min(3, self.cursor_history.maxlen)):
+                smooth_x = int(np.mean([pos[0] for pos in self.cursor_history]))
+                smooth_y = int(np.mean([pos[1] for pos in self.cursor_history]))
+                cursor_pos = (smooth_x, smooth_y)
+        
+        # Gesture stability check
+        if gesture == self.last_gesture:
+            self.gesture_stable_count += 1
+        else:
+            self.gesture_stable_count = 0
+            self.last_gesture = gesture
+        
+        # Handle interactions
+        keyboard.hovered_key = None
+        keyboard.pressed_key = None
+        
+        if cursor_pos and self.gesture_stable_count >= self.gesture_stability_threshold:
+            hovered_key = keyboard.key_at_position(*cursor_pos)
+            keyboard.hovered_key = hovered_key
+            
+            if gesture == "FIST" and self.click_cooldown <= 0:
+                if hovered_key:
+                    keyboard.type_key(hovered_key)
+                    keyboard.pressed_key = hovered_key
+                    self.click_cooldown = self.click_cooldown_frames
+                    typed_key = hovered_key
+            
+            elif gesture == "OPEN_PALM":
+                # Hover mode for hands-free typing
+                if hovered_key:
+                    typed_key = keyboard.update_hover(hovered_key, current_time)
+            else:
+                keyboard.hover_key = None
+        
+        # Update cooldowns
+        if self.click_cooldown > 0:
+            self.click_cooldown -= 1
+        
+        return cursor_pos, typed_key
+
+
+class TrajectoryRecorder:
+    """Records raw per-frame tracking output for offline replay by evaluate_keyboard.py.
+    
+    Positions are stored before smoothing, since the replay runs them
+    through InteractionController again.
+    """
+    def __init__(self, phrase):
+        self.phrase = phrase
+        self.frames = []
+    
+    def record(self, timestamp, gesture, cursor_pos):
+        """Store one frame as [time, gesture, x, y]; x and y are None without a hand."""
+        x, y = cursor_pos if cursor_pos else (None, None)
+        self.frames.append([timestamp, gesture, x, y])
+    
+    def to_dict(self):
+        return {"phrase": self.phrase, "frames": self.frames}
 
 
 def save_text_to_file(text):
@@ -346,7 +440,24 @@ def save_text_to_file(text):
         print(f"Error saving file: {e}")
 
 
-def main():
+def save_trajectory_to_file(recorder):
+    """Save a recorded trajectory as JSON."""
+    if not recorder.frames:
+        print("No trajectory to save.")
+        return
+    
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"virtual_keyboard_trajectory_{timestamp}.json"
+    
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(recorder.to_dict(), f)
+        print(f"Trajectory saved to {filename}")
+    except Exception as e:
+        print(f"Error saving file: {e}")
+
+
+def main(record_phrase=None):
     # Configuration
     VIDEO_SOURCE = 0  # Change this to your  camera source
     # VIDEO_SOURCE = 0  # Use this for webcam
@@ -356,17 +467,10 @@ def main():
     hand_tracker = HandTracker()
     keyboard = AdvancedVirtualKeyboard()
     
-    # Smoothing for cursor
-    cursor_history = deque(maxlen=5)
-    
-    # Control variables
-    last_gesture = None
-    gesture_stable_count = 0
-    gesture_stability_threshold = 3
+    controller = InteractionController(keyboard)
     
-    # Click detection
-    click_cooldown = 0
-    click_cooldown_frames = 10
+    # Optional recording of raw tracking output for evaluate_keyboard.py
+    recorder = TrajectoryRecorder(record_phrase) if record_phrase is not None else None
     
     print("Enhanced Virtual Keyboard with MediaPipe")
     print("Gestures:")
@@ -375,6 +479,8 @@ def main():
     print("- PEACE: Right-click menu (future feature)")
     print("- OPEN_PALM: Hover mode (auto-type)")
     print("- Press ESC to exit")
+    if recorder:
+        print(f"Recording trajectory for: {record_phrase!r}")
     
     frame_count = 0
     fps_counter = deque(maxlen=30)
@@ -392,51 +498,20 @@ def main():
             # Process hand tracking
             gesture, cursor_pos, hand_landmarks = hand_tracker.process_frame(frame)
             
-            # Smooth cursor movement
+            # Record raw (unsmoothed) tracking output
+            if recorder:
+                recorder.record(time.time(), gesture, cursor_pos)
+            
+            # Smooth cursor and handle interactions
+            cursor_pos, typed_key = controller.step(gesture, cursor_pos)
+            if typed_key and keyboard.pressed_key == typed_key:
+                print(f"Typed: {typed_key}")
+            
+            # Draw cursor
             if cursor_pos:
-                cursor_history.append(cursor_pos)
-                if len(cursor_history) >= 3:
-                    smooth_x = int(np.mean([pos[0] for pos in cursor_history]))
-                    smooth_y = int(np.mean([pos[1] for pos in cursor_history]))
-                    cursor_pos = (smooth_x, smooth_y)
-                
-                # Draw cursor
                 cv2.circle(frame, cursor_pos, 12, (0, 255, 0), -1)
                 cv2.circle(frame, cursor_pos, 15, (255, 255, 255), 2)
             
-            # Gesture stability check
-            if gesture == last_gesture:
-                gesture_stable_count += 1
-            else:
-                gesture_stable_count = 0
-                last_gesture = gesture
-            
-            # Handle interactions
-            keyboard.hovered_key = None
-            keyboard.pressed_key = None
-            
-            if cursor_pos and gesture_stable_count >= gesture_stability_threshold:
-                hovered_key = keyboard.key_at_position(*cursor_pos)
-                keyboard.hovered_key = hovered_key
-                
-                if gesture == "FIST" and click_cooldown <= 0:
-                    if hovered_key:
-                        keyboard.type_key(hovered_key)
-                        keyboard.pressed_key = hovered_key
-                        click_cooldown = click_cooldown_frames
-                        print(f"Typed: {hovered_key}")
-                
-                elif gesture == "OPEN_PALM":
-                    # Hover mode for hands-free typing
-                    if hovered_key:
-                        keyboard.update_hover(hovered_key)
-                else:
-                    keyboard.hover_key = None
-            
-            # Update cooldowns
-            if click_cooldown > 0:
-                click_cooldown -= 1
-            
             # Draw UI
             keyboard.draw(frame)
             
@@ -475,6 +550,9 @@ def main():
         stream.stop()
         cv2.destroyAllWindows()
         
+        if recorder:
+            save_trajectory_to_file(recorder)
+        
         # Ask to save text
         if keyboard.text.strip():
             while True:
@@ -496,4 +574,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Type in the air with hand gestures.")
+    parser.add_argument('--record', metavar='PHRASE',
+                        help="Record this session's tracking output for the given target phrase")
+    args = parser.parse_args()
+    main(record_phrase=args.record)